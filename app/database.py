@@ -1,5 +1,5 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
@@ -13,9 +13,7 @@ class Database:
         """Initialize the async engine and sessionmaker."""
         if cls._engine is None:  # Ensure engine is created once
             cls._engine = create_async_engine(database_url, echo=echo, future=True)
-            cls._session_factory = sessionmaker(
-                bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
-            )
+            cls._session_factory = async_sessionmaker(bind=cls._engine, expire_on_commit=False)
 
     @classmethod
     def get_session_factory(cls):
@@ -1,5 +1,6 @@
 from builtins import Exception
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware  # Import the CORSMiddleware
 from app.database import Database
@@ -16,6 +17,7 @@ app = FastAPI(
         "email": "support@example.com",
     },
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    default_response_class=ORJSONResponse,  # orjson renders response bodies straight to bytes, faster than json.dumps
 )
 # CORS middleware configuration
 # This middleware will enable CORS and allow requests from any origin
@@ -48,4 +48,4 @@ class EmailService:
             "Cheers,\n"
             "The Product Team"
         )
-        self.smtp_client.send_email(user_email, subject, body)
\ No newline at end of file
+        self.smtp_client.send_email(subject, body, user_email)
\ No newline at end of file
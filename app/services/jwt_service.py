@@ -1,9 +1,18 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import dict, len, str
+import hashlib
+import threading
+import time
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
 
+# Verified payloads keyed by the SHA-256 of the raw token, so repeat requests with the same
+# bearer token skip signature verification. Entries are only served until the token's `exp`.
+_DECODED_CACHE_MAXSIZE = 10_000
+_decoded_cache: dict = {}
+_decoded_cache_lock = threading.Lock()
+
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     # Convert role to uppercase before encoding the JWT
@@ -15,8 +24,22 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 def decode_token(token: str):
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    cached = _decoded_cache.get(key)
+    if cached is not None:
+        if cached["exp"] > time.time():
+            return dict(cached)
+        with _decoded_cache_lock:
+            _decoded_cache.pop(key, None)
     try:
         decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return decoded
     except jwt.PyJWTError:
         return None
+    # Only tokens that expire are cached; failed verifications never are.
+    if "exp" in decoded:
+        with _decoded_cache_lock:
+            if len(_decoded_cache) >= _DECODED_CACHE_MAXSIZE:
+                # dicts keep insertion order, so this evicts the oldest entry
+                _decoded_cache.pop(next(iter(_decoded_cache)))
+            _decoded_cache[key] = dict(decoded)
+    return decoded
@@ -1,19 +1,22 @@
 # app/security.py
 from builtins import Exception, ValueError, bool, int, str
 import secrets
+from typing import Optional
 import bcrypt
 from logging import getLogger
+from settings.config import settings
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Hashes a password using bcrypt with a specified cost factor.
     
     Args:
         password (str): The plain text password to hash.
         rounds (int): The cost factor that determines the computational cost of hashing.
+            Defaults to `settings.bcrypt_rounds`.
 
     Returns:
         str: The hashed password.
@@ -22,7 +25,7 @@ def hash_password(password: str, rounds: int = 12) -> str:
         ValueError: If hashing the password fails.
     """
     try:
-        salt = bcrypt.gensalt(rounds=rounds)
+        salt = bcrypt.gensalt(rounds=rounds if rounds is not None else settings.bcrypt_rounds)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
     except Exception as e:
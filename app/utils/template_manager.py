@@ -1,6 +1,13 @@
 import markdown2
+from functools import lru_cache
 from pathlib import Path
 
+@lru_cache(maxsize=None)
+def _read_template_file(template_path: Path) -> str:
+    """Read a template file once per process; every render after that reuses the cached text."""
+    with open(template_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
 class TemplateManager:
     def __init__(self):
         # Dynamically determine the root path of the project
@@ -9,9 +16,7 @@ class TemplateManager:
 
     def _read_template(self, filename: str) -> str:
         """Private method to read template content."""
-        template_path = self.templates_dir / filename
-        with open(template_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        return _read_template_file(self.templates_dir / filename)
 
     def _apply_email_styles(self, html: str) -> str:
         """Apply advanced CSS styles inline for email compatibility with excellent typography."""
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     admin_user: str = Field(default='admin', description="Default admin username")
     admin_password: str = Field(default='secret', description="Default admin password")
     debug: bool = Field(default=False, description="Debug mode outputs errors and sqlalchemy queries")
+    bcrypt_rounds: int = Field(default=12, description="Default bcrypt cost factor used when hashing passwords")
     jwt_secret_key: str = "a_very_secret_key"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 15  # 15 minutes for access token
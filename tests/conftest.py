@@ -5,30 +5,35 @@ Overview:
 This Python test file utilizes pytest to manage database states and HTTP clients for testing a web application built with FastAPI and SQLAlchemy. It includes detailed fixtures to mock the testing environment, ensuring each test is run in isolation with a consistent setup.
 
 Fixtures:
+- `app_instance`: Imports the FastAPI application on first use.
 - `async_client`: Manages an asynchronous HTTP client for testing interactions with the FastAPI application.
-- `db_session`: Handles database transactions to ensure a clean database state for each test.
+- `db_session`: Wraps each test in a transaction and SAVEPOINT that are rolled back afterwards, so every test sees a clean database.
+- `user_factory`: Builds `User` rows with sensible defaults; keyword arguments override individual fields.
+- `user_pool`: Inserts all of a test's role/state users (`user`, `admin_user`, `locked_user`, ...) in a single statement.
 - User fixtures (`user`, `locked_user`, `verified_user`, etc.): Set up various user states to test different behaviors under diverse conditions.
-- `token`: Generates an authentication token for testing secured endpoints.
+- `token_for`: Generates an authentication token for a given user; `admin_token`, `user_token`, etc. build on it.
 - `initialize_database`: Prepares the database at the session start.
-- `setup_database`: Sets up and tears down the database before and after each test.
+- `engine`: Provides one async engine, and its connection pool, for the whole test session.
+- `setup_database`: Creates the schema the first time a test needs the database and drops it at the end of the session.
 """
 
 # Standard library imports
 from builtins import Exception, range, str
-from datetime import timedelta
-from unittest.mock import AsyncMock, patch
-from uuid import uuid4
+from datetime import timedelta, timezone
+from functools import lru_cache
+from itertools import cycle
+import os
 
 # Third-party imports
 import pytest
-from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import DateTime, event, insert, inspect, make_url, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import StaticPool
 from faker import Faker
 
 # Application-specific imports
-from app.main import app
 from app.database import Base, Database
 from app.models.user_model import User, UserRole
 from app.dependencies import get_db, get_settings
@@ -36,17 +41,28 @@ from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token
-
-fake = Faker()
+from settings.config import settings as config_settings
 
 settings = get_settings()
-TEST_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-engine = create_async_engine(TEST_DATABASE_URL, echo=settings.debug)
-AsyncTestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-AsyncSessionScoped = scoped_session(AsyncTestingSessionLocal)
+# set PYTEST_SQLITE=1 to run the suite against an in-memory SQLite database instead of Postgres
+USE_SQLITE = os.getenv("PYTEST_SQLITE") == "1"
+# set by pytest-xdist (`pytest -n auto`) in each worker process, e.g. "gw0"
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+if USE_SQLITE:
+    TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+else:
+    TEST_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
+    # every xdist worker gets its own database, e.g. myappdb_gw0
+    if XDIST_WORKER:
+        base_url = make_url(TEST_DATABASE_URL)
+        TEST_DATABASE_URL = base_url.set(database=f"{base_url.database}_{XDIST_WORKER}").render_as_string(hide_password=False)
+# unbound here; each test binds its session to the connection that holds its rolled back transaction.
+# create_savepoint makes every session commit/rollback act on a SAVEPOINT, never on that outer transaction.
+AsyncTestingSessionLocal = async_sessionmaker(expire_on_commit=False, join_transaction_mode="create_savepoint")
 
 
-@pytest.fixture
+# the service holds no per-test state and SMTP delivery is stubbed on the class, so one instance serves the whole session
+@pytest.fixture(scope="session")
 def email_service():
     # Assuming the TemplateManager does not need any arguments for initialization
     template_manager = TemplateManager()
@@ -54,17 +70,45 @@ def email_service():
     return email_service
 
 
-# this is what creates the http client for your api tests
-@pytest.fixture(scope="function")
-async def async_client(db_session):
+# the FastAPI app is imported lazily so tests that never make HTTP calls don't pay for building it
+@pytest.fixture(scope="session")
+def app_instance():
+    from app.main import app
+    return app
+
+# this is what creates the http client for your api tests; one client is shared by the whole session
+@pytest.fixture(scope="session")
+async def _http_client(app_instance):
     # Use ASGITransport to run our FastAPI app in httpx.AsyncClient
-    transport = ASGITransport(app=app)
+    transport = ASGITransport(app=app_instance)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
-        app.dependency_overrides[get_db] = lambda: db_session
-        try:
-            yield client
-        finally:
-            app.dependency_overrides.clear()
+        yield client
+
+# each test points the app's get_db dependency at its own rolled back db_session
+@pytest.fixture(scope="function")
+async def async_client(app_instance, _http_client, db_session):
+    app_instance.dependency_overrides[get_db] = lambda: db_session
+    try:
+        yield _http_client
+    finally:
+        app_instance.dependency_overrides.pop(get_db, None)
+
+# installed once for the whole session so no test ever opens a real SMTP connection (unless real mail is requested)
+@pytest.fixture(scope="session", autouse=True)
+def _stub_smtp_session():
+    if settings.send_real_mail:
+        yield
+        return
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("app.utils.smtp_connection.SMTPClient.send_email", lambda self, *args, **kwargs: None)
+        yield
+
+# bcrypt at the minimum cost factor keeps real $2b$ hashes (and verify_password) but skips most of the key schedule
+@pytest.fixture(scope="session", autouse=True)
+def _fast_bcrypt():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config_settings, "bcrypt_rounds", 4)
+        yield
 
 @pytest.fixture(scope="session", autouse=True)
 def initialize_database():
@@ -73,189 +117,225 @@ def initialize_database():
     except Exception as e:
         pytest.fail(f"Failed to initialize the database: {str(e)}")
 
-# this function setup and tears down (drops tales) for each test function, so you have a clean database for each test.
-@pytest.fixture(scope="function", autouse=True)
-async def setup_database():
+# the sqlite driver manages transactions itself and breaks SAVEPOINTs, so let SQLAlchemy emit BEGIN instead
+def _enable_sqlite_savepoints(sqlite_engine):
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sqlite_engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+# SQLite has no timezone type, so DateTime(timezone=True) columns come back naive; values are written as UTC
+# (the app and tests only use datetime.now(timezone.utc), and CURRENT_TIMESTAMP is UTC), so tag them as such on load.
+def _restore_sqlite_timezones():
+    def mark_utc(target, attrs=None):
+        state = inspect(target)
+        for column in state.mapper.columns:
+            if not (isinstance(column.type, DateTime) and column.type.timezone):
+                continue
+            key = state.mapper.get_property_by_column(column).key
+            if attrs is not None and key not in attrs:
+                continue
+            value = state.dict.get(key)
+            if value is not None and value.tzinfo is None:
+                set_committed_value(target, key, value.replace(tzinfo=timezone.utc))
+
+    @event.listens_for(Base, "load", propagate=True)
+    def on_load(target, context):
+        mark_utc(target)
+
+    @event.listens_for(Base, "refresh", propagate=True)
+    def on_refresh(target, context, attrs):
+        mark_utc(target, attrs)
+
+# per-worker databases are created on first use; CREATE DATABASE cannot run inside a transaction, hence AUTOCOMMIT
+async def _create_database_if_missing(database_url):
+    url = make_url(database_url)
+    admin_engine = create_async_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        async with admin_engine.connect() as conn:
+            exists = await conn.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": url.database})
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        await admin_engine.dispose()
+
+# one engine (and connection pool) is shared by the whole test session instead of reconnecting for every test.
+# SQL echo stays off even when DEBUG is set for the app; logging every statement dominates fixture-heavy tests.
+@pytest.fixture(scope="session")
+async def engine():
+    if USE_SQLITE:
+        # StaticPool keeps a single connection so every session sees the same in-memory database
+        test_engine = create_async_engine(
+            TEST_DATABASE_URL,
+            echo=False,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        _enable_sqlite_savepoints(test_engine)
+        _restore_sqlite_timezones()
+    else:
+        if XDIST_WORKER:
+            await _create_database_if_missing(TEST_DATABASE_URL)
+        test_engine = create_async_engine(TEST_DATABASE_URL, echo=False, pool_size=5, max_overflow=0)
+    yield test_engine
+    await test_engine.dispose()
+
+# the schema is created once for the whole test session; each test runs inside a rolled back transaction instead of rebuilding tables.
+# not autouse: only tests that request db_session (directly or through another fixture) connect to the database.
+@pytest.fixture(scope="session")
+async def setup_database(engine):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
-    async with engine.begin() as conn:
-        # you can comment out this line during development if you are debugging a single test
-         await conn.run_sync(Base.metadata.drop_all)
-    await engine.dispose()
+    # set KEEP_TEST_DB=1 to skip the teardown, e.g. in CI where the database container is thrown away anyway
+    if os.getenv("KEEP_TEST_DB") != "1":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
 
 @pytest.fixture(scope="function")
-async def db_session(setup_database):
-    async with AsyncSessionScoped() as session:
-        try:
+async def db_session(engine, setup_database):
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        async with AsyncTestingSessionLocal(bind=conn) as session:
             yield session
-        finally:
-            await session.close()
+        await trans.rollback()
 
-@pytest.fixture(scope="function")
-async def locked_user(db_session):
-    unique_email = fake.email()
-    user_data = {
-        "nickname": fake.user_name(),
-        "first_name": fake.first_name(),
-        "last_name": fake.last_name(),
-        "email": unique_email,
-        "hashed_password": hash_password("MySuperPassword$1234"),
-        "role": UserRole.AUTHENTICATED,
-        "email_verified": False,
-        "is_locked": True,
-        "failed_login_attempts": settings.max_login_attempts,
+# plaintext password of every fixture-built user; tests that log in or verify it spell the same literal out
+DEFAULT_PASSWORD = "MySuperPassword$1234"
+
+# hashing is deliberately slow, so each test password is hashed only once per session.
+# The first call happens inside a fixture (after _fast_bcrypt lowers the cost), not at import time.
+@lru_cache(maxsize=None)
+def _cached_hash(password: str) -> str:
+    return hash_password(password)
+
+@pytest.fixture(scope="session")
+def fake():
+    return Faker()
+
+# fake names and emails are generated once per session and handed out round-robin; any 500 consecutive draws are unique
+@pytest.fixture(scope="session")
+def fake_pool(fake):
+    return {
+        "nicknames": cycle([fake.unique.user_name() for _ in range(500)]),
+        "firsts": cycle([fake.first_name() for _ in range(50)]),
+        "lasts": cycle([fake.last_name() for _ in range(50)]),
+        "emails": cycle([fake.unique.email() for _ in range(500)]),
     }
-    user = User(**user_data)
-    db_session.add(user)
-    await db_session.commit()
-    return user
 
-@pytest.fixture(scope="function")
-async def user(db_session):
-    user_data = {
-        "nickname": fake.user_name(),
-        "first_name": fake.first_name(),
-        "last_name": fake.last_name(),
-        "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
+# column values for an AUTHENTICATED, unverified, unlocked user; every row carries the same keys so bulk inserts stay a single statement
+def _default_user_data(fake_pool):
+    return {
+        "nickname": next(fake_pool["nicknames"]),
+        "first_name": next(fake_pool["firsts"]),
+        "last_name": next(fake_pool["lasts"]),
+        "email": next(fake_pool["emails"]),
+        "hashed_password": _cached_hash(DEFAULT_PASSWORD),
         "role": UserRole.AUTHENTICATED,
         "email_verified": False,
         "is_locked": False,
+        "failed_login_attempts": 0,
     }
-    user = User(**user_data)
-    db_session.add(user)
-    await db_session.commit()
-    return user
 
+# builds a user from the defaults above and adds it to the session; keyword arguments override any field
 @pytest.fixture(scope="function")
-async def verified_user(db_session):
-    user_data = {
-        "nickname": fake.user_name(),
-        "first_name": fake.first_name(),
-        "last_name": fake.last_name(),
-        "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
-        "role": UserRole.AUTHENTICATED,
-        "email_verified": True,
-        "is_locked": False,
-    }
-    user = User(**user_data)
-    db_session.add(user)
-    await db_session.commit()
-    return user
+def user_factory(db_session, fake_pool):
+    def make(**overrides):
+        user = User(**{**_default_user_data(fake_pool), **overrides})
+        db_session.add(user)
+        return user
+    return make
+
+# overrides for each user fixture that user_pool can insert together
+_POOLED_USERS = {
+    "user": {},
+    "verified_user": {"email_verified": True},
+    "unverified_user": {},
+    "locked_user": {"is_locked": True, "failed_login_attempts": settings.max_login_attempts},
+    "admin_user": {"first_name": "John", "last_name": "Doe", "role": UserRole.ADMIN},
+    "manager_user": {"first_name": "John", "last_name": "Doe", "role": UserRole.MANAGER},
+}
 
+# the first pooled user a test asks for inserts every pooled user in that test's fixture closure with one INSERT ... RETURNING;
+# users only requested later through getfixturevalue are inserted on demand.
 @pytest.fixture(scope="function")
-async def unverified_user(db_session):
-    user_data = {
-        "nickname": fake.user_name(),
-        "first_name": fake.first_name(),
-        "last_name": fake.last_name(),
-        "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
-        "role": UserRole.AUTHENTICATED,
-        "email_verified": False,
-        "is_locked": False,
-    }
-    user = User(**user_data)
-    db_session.add(user)
-    await db_session.commit()
-    return user
+async def user_pool(request, db_session, fake_pool):
+    users = {}
+
+    async def get(name):
+        if name not in users:
+            names = [n for n in _POOLED_USERS if n not in users and (n == name or n in request.fixturenames)]
+            rows = [{**_default_user_data(fake_pool), **_POOLED_USERS[n]} for n in names]
+            result = await db_session.scalars(insert(User).returning(User, sort_by_parameter_order=True), rows)
+            users.update(zip(names, result.all()))
+            await db_session.commit()
+        return users[name]
+    return get
+
+@pytest.fixture(scope="function")
+async def locked_user(user_pool):
+    return await user_pool("locked_user")
+
+@pytest.fixture(scope="function")
+async def user(user_pool):
+    return await user_pool("user")
+
+@pytest.fixture(scope="function")
+async def verified_user(user_pool):
+    return await user_pool("verified_user")
+
+@pytest.fixture(scope="function")
+async def unverified_user(user_pool):
+    return await user_pool("unverified_user")
 
 @pytest.fixture
-async def professional_user(db_session: AsyncSession):
-    user = User(
-        nickname="ProfessionalUser",
-        email="professional@example.com",
-        password_hash=hash_password("StrongPassword123!"),
+async def professional_user(user_factory, db_session: AsyncSession):
+    user = user_factory(
+        hashed_password=_cached_hash("StrongPassword123!"),
         is_professional=True,
-        role="AUTHENTICATED"
     )
-    db_session.add(user)
     await db_session.commit()
-    await db_session.refresh(user)
     return user
 
 @pytest.fixture(scope="function")
-async def users_with_same_role_50_users(db_session):
-    users = []
-    for _ in range(50):
-        user_data = {
-            "nickname": fake.user_name(),
-            "first_name": fake.first_name(),
-            "last_name": fake.last_name(),
-            "email": fake.email(),
-            "hashed_password": fake.password(),
-            "role": UserRole.AUTHENTICATED,
-            "email_verified": False,
-            "is_locked": False,
-        }
-        user = User(**user_data)
-        db_session.add(user)
-        users.append(user)
-    await db_session.commit()
-    return users
+async def users_with_same_role_50_users(db_session, fake_pool):
+    # one bulk INSERT for all 50 rows; the tests only count and page through them, so the plain row dicts are returned
+    payload = [_default_user_data(fake_pool) for _ in range(50)]
+    await db_session.execute(insert(User), payload)
+    await db_session.flush()
+    return payload
 
 @pytest.fixture
-async def admin_user(db_session: AsyncSession):
-    user = User(
-        nickname="admin_user",
-        email="admin@example.com",
-        first_name="John",
-        last_name="Doe",
-        hashed_password="securepassword",
-        role=UserRole.ADMIN,
-        is_locked=False,
-    )
-    db_session.add(user)
-    await db_session.commit()
-    return user
+async def admin_user(user_pool):
+    return await user_pool("admin_user")
 
 @pytest.fixture
-async def manager_user(db_session: AsyncSession):
-    user = User(
-        nickname="manager_john",
-        first_name="John",
-        last_name="Doe",
-        email="manager_user@example.com",
-        hashed_password="securepassword",
-        role=UserRole.MANAGER,
-        is_locked=False,
-    )
-    db_session.add(user)
-    await db_session.commit()
-    return user
+async def manager_user(user_pool):
+    return await user_pool("manager_user")
+
+# one place to sign a token for any user fixture; admin_token, user_token, etc. build on it
+@pytest.fixture(scope="session")
+def token_for():
+    def make(user):
+        return create_access_token(data={"sub": str(user.id), "role": user.role.name}, expires_delta=timedelta(minutes=30))
+    return make
 
 # Configure a fixture for each type of user role you want to test
 @pytest.fixture(scope="function")
-def admin_token(admin_user):
-    # Assuming admin_user has an 'id' and 'role' attribute
-    token_data = {"sub": str(admin_user.id), "role": admin_user.role.name}
-    return create_access_token(data=token_data, expires_delta=timedelta(minutes=30))
+def admin_token(admin_user, token_for):
+    return token_for(admin_user)
 
 @pytest.fixture(scope="function")
-def manager_token(manager_user):
-    token_data = {"sub": str(manager_user.id), "role": manager_user.role.name}
-    return create_access_token(data=token_data, expires_delta=timedelta(minutes=30))
+def manager_token(manager_user, token_for):
+    return token_for(manager_user)
 
 @pytest.fixture(scope="function")
-def user_token(user):
-    token_data = {"sub": str(user.id), "role": user.role.name}
-    return create_access_token(data=token_data, expires_delta=timedelta(minutes=30))
+def user_token(user, token_for):
+    return token_for(user)
 
 @pytest.fixture(scope="function")
-def auth_token(verified_user):
-    token_data = {"sub": str(verified_user.id), "role": verified_user.role.name}
-    return create_access_token(data=token_data, expires_delta=timedelta(minutes=30))
-
-@pytest.fixture
-def email_service():
-    if settings.send_real_mail == 'true':
-        # Return the real email service when specifically testing email functionality
-        return EmailService()
-    else:
-        # Otherwise, use a mock to prevent actual email sending
-        mock_service = AsyncMock(spec=EmailService)
-        mock_service.send_verification_email.return_value = None
-        mock_service.send_user_email.return_value = None
-        return mock_service
\ No newline at end of file
+def auth_token(verified_user, token_for):
+    return token_for(verified_user)
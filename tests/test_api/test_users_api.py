@@ -1,11 +1,15 @@
 from builtins import str
 import pytest
-from httpx import AsyncClient
-from app.main import app
 from app.models.user_model import User, UserRole
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import hash_password
-from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.services.jwt_service import decode_token
+
+# access-denied requests are rejected before the nickname is read, so a fixed value is enough
+NICK = "deniedcat123"
+
+# error details returned by /login/
+INVALID_CREDENTIALS_MSG = "Incorrect email or password."
+LOCKED_MSG = "Account locked due to too many failed login attempts."
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -13,7 +17,7 @@ async def test_create_user_access_denied(async_client, user_token, email_service
     headers = {"Authorization": f"Bearer {user_token}"}
     # Define user data for the test
     user_data = {
-        "nickname": generate_nickname(),
+        "nickname": NICK,
         "email": "test@example.com",
         "password": "sS#fdasrongPassword123!",
     }
@@ -22,6 +26,19 @@ async def test_create_user_access_denied(async_client, user_token, email_service
     # Asserts
     assert response.status_code == 403
 
+@pytest.mark.asyncio
+async def test_create_user_success(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    user_data = {
+        "nickname": generate_nickname(),
+        "email": "created_by_admin@example.com",
+        "password": "sS#fdasrongPassword123!",
+        "role": UserRole.AUTHENTICATED.name,
+    }
+    response = await async_client.post("/users/", json=user_data, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["email"] == user_data["email"]
+
 # You can similarly refactor other test functions to use the async_client fixture
 @pytest.mark.asyncio
 async def test_retrieve_user_access_denied(async_client, verified_user, user_token):
@@ -44,12 +61,17 @@ async def test_update_user_email_access_denied(async_client, verified_user, user
     assert response.status_code == 403
 
 @pytest.mark.asyncio
-async def test_update_user_email_access_allowed(async_client, admin_user, admin_token):
-    updated_data = {"email": f"updated_{admin_user.id}@example.com"}
+@pytest.mark.parametrize("field,value", [
+    ("email", "updated_admin@example.com"),
+    ("github_profile_url", "http://www.github.com/kaw393939"),
+    ("linkedin_profile_url", "http://www.linkedin.com/kaw393939"),
+])
+async def test_update_user_field_access_allowed(async_client, admin_user, admin_token, field, value):
+    updated_data = {field: value}
     headers = {"Authorization": f"Bearer {admin_token}"}
     response = await async_client.put(f"/users/{admin_user.id}", json=updated_data, headers=headers)
     assert response.status_code == 200
-    assert response.json()["email"] == updated_data["email"]
+    assert response.json()[field] == value
 
 @pytest.mark.asyncio
 async def test_update_nonexistent_user(async_client, admin_token):
@@ -99,13 +121,18 @@ async def test_update_user_success(async_client, verified_user, auth_token):
     assert response.status_code == 403
 
 @pytest.mark.asyncio
-async def test_delete_user(async_client, admin_user, admin_token):
+async def test_delete_user(async_client, db_session, admin_user, admin_token):
     headers = {"Authorization": f"Bearer {admin_token}"}
     delete_response = await async_client.delete(f"/users/{admin_user.id}", headers=headers)
     assert delete_response.status_code == 204
-    # Verify the user is deleted
-    fetch_response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
-    assert fetch_response.status_code == 404
+    # Verify the user is deleted; the API shares db_session, so check the row directly
+    assert await db_session.get(User, admin_user.id) is None
+
+@pytest.mark.asyncio
+async def test_delete_user_not_allowed(async_client, verified_user, user_token):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = await async_client.delete(f"/users/{verified_user.id}", headers=headers)
+    assert response.status_code == 403
 
 @pytest.mark.asyncio
 async def test_create_user_duplicate_email(async_client, verified_user):
@@ -127,10 +154,6 @@ async def test_create_user_invalid_email(async_client):
     response = await async_client.post("/register/", json=user_data)
     assert response.status_code == 422
 
-import pytest
-from app.services.jwt_service import decode_token
-from urllib.parse import urlencode
-
 @pytest.mark.asyncio
 async def test_login_success(async_client, verified_user):
     # Attempt to login with the test user
@@ -138,7 +161,7 @@ async def test_login_success(async_client, verified_user):
         "username": verified_user.email,
         "password": "MySuperPassword$1234"
     }
-    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    response = await async_client.post("/login/", data=form_data)
     
     # Check for successful login response
     assert response.status_code == 200
@@ -151,26 +174,6 @@ async def test_login_success(async_client, verified_user):
     assert decoded_token is not None, "Failed to decode token"
     assert decoded_token["role"] == "AUTHENTICATED", "The user role should be AUTHENTICATED"
 
-@pytest.mark.asyncio
-async def test_login_user_not_found(async_client):
-    form_data = {
-        "username": "nonexistentuser@here.edu",
-        "password": "DoesNotMatter123!"
-    }
-    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
-    assert response.status_code == 401
-    assert "Incorrect email or password." in response.json().get("detail", "")
-
-@pytest.mark.asyncio
-async def test_login_incorrect_password(async_client, verified_user):
-    form_data = {
-        "username": verified_user.email,
-        "password": "IncorrectPassword123!"
-    }
-    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
-    assert response.status_code == 401
-    assert "Incorrect email or password." in response.json().get("detail", "")
-
 @pytest.mark.asyncio
 async def test_login_weak_password(async_client, verified_user):
     user_data = {
@@ -187,24 +190,30 @@ async def test_login_weak_password(async_client, verified_user):
     assert found, "Expected password length error message not found in response details"
 
 
-@pytest.mark.asyncio
-async def test_login_unverified_user(async_client, unverified_user):
-    form_data = {
-        "username": unverified_user.email,
-        "password": "MySuperPassword$1234"
-    }
-    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
-    assert response.status_code == 401
+# resolves the parametrized user fixture during setup; None stands for an email that was never registered
+@pytest.fixture
+def login_username(request):
+    if request.param is None:
+        return "nonexistentuser@here.edu"
+    return request.getfixturevalue(request.param).email
 
 @pytest.mark.asyncio
-async def test_login_locked_user(async_client, locked_user):
+@pytest.mark.parametrize("login_username,password,status,detail", [
+    (None, "DoesNotMatter123!", 401, INVALID_CREDENTIALS_MSG),
+    ("verified_user", "IncorrectPassword123!", 401, INVALID_CREDENTIALS_MSG),
+    ("unverified_user", "MySuperPassword$1234", 401, INVALID_CREDENTIALS_MSG),
+    ("locked_user", "MySuperPassword$1234", 400, LOCKED_MSG),
+], indirect=["login_username"], ids=["user_not_found", "incorrect_password", "unverified_user", "locked_user"])
+async def test_login_rejected(async_client, login_username, password, status, detail):
     form_data = {
-        "username": locked_user.email,
-        "password": "MySuperPassword$1234"
+        "username": login_username,
+        "password": password
     }
-    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
-    assert response.status_code == 400
-    assert "Account locked due to too many failed login attempts." in response.json().get("detail", "")
+    response = await async_client.post("/login/", data=form_data)
+    assert response.status_code == status
+    body = response.json()
+    assert detail in body["detail"]
+
 @pytest.mark.asyncio
 async def test_delete_user_does_not_exist(async_client, admin_token):
     non_existent_user_id = "00000000-0000-0000-0000-000000000000"  # Valid UUID format
@@ -212,39 +221,20 @@ async def test_delete_user_does_not_exist(async_client, admin_token):
     delete_response = await async_client.delete(f"/users/{non_existent_user_id}", headers=headers)
     assert delete_response.status_code == 404
 
-@pytest.mark.asyncio
-async def test_update_user_github(async_client, admin_user, admin_token):
-    updated_data = {"github_profile_url": "http://www.github.com/kaw393939"}
-    headers = {"Authorization": f"Bearer {admin_token}"}
-    response = await async_client.put(f"/users/{admin_user.id}", json=updated_data, headers=headers)
-    assert response.status_code == 200
-    assert response.json()["github_profile_url"] == updated_data["github_profile_url"]
-
-@pytest.mark.asyncio
-async def test_update_user_linkedin(async_client, admin_user, admin_token):
-    updated_data = {"linkedin_profile_url": "http://www.linkedin.com/kaw393939"}
-    headers = {"Authorization": f"Bearer {admin_token}"}
-    response = await async_client.put(f"/users/{admin_user.id}", json=updated_data, headers=headers)
-    assert response.status_code == 200
-    assert response.json()["linkedin_profile_url"] == updated_data["linkedin_profile_url"]
+# resolved during fixture setup, outside the running event loop, so the async user fixtures behind each token still work
+@pytest.fixture(params=["admin_token", "manager_token"])
+def privileged_token(request):
+    return request.getfixturevalue(request.param)
 
 @pytest.mark.asyncio
-async def test_list_users_as_admin(async_client, admin_token):
+async def test_list_users_as_privileged_role(async_client, privileged_token):
     response = await async_client.get(
         "/users/",
-        headers={"Authorization": f"Bearer {admin_token}"}
+        headers={"Authorization": f"Bearer {privileged_token}"}
     )
     assert response.status_code == 200
     assert 'items' in response.json()
 
-@pytest.mark.asyncio
-async def test_list_users_as_manager(async_client, manager_token):
-    response = await async_client.get(
-        "/users/",
-        headers={"Authorization": f"Bearer {manager_token}"}
-    )
-    assert response.status_code == 200
-
 @pytest.mark.asyncio
 async def test_list_users_unauthorized(async_client, user_token):
     response = await async_client.get(
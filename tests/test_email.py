@@ -1,19 +1,34 @@
 import pytest
-from app.services.email_service import EmailService
-from app.utils.template_manager import TemplateManager
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def sent_emails(email_service, monkeypatch):
+    # Records every send_email call made through the shared email_service
+    mock = MagicMock(return_value=None)
+    monkeypatch.setattr(email_service.smtp_client, "send_email", mock)
+    return mock.call_args_list
 
-    
 @pytest.mark.asyncio
-async def test_send_markdown_email(email_service):
+async def test_send_markdown_email(email_service, sent_emails):
     user_data = {
         "email": "test@example.com",
         "name": "Test User",
         "verification_url": "http://example.com/verify?token=abc123"
     }
     await email_service.send_user_email(user_data, 'email_verification')
-    # Manual verification in Mailtrap
+    assert len(sent_emails) == 1
+    subject, html_content, recipient = sent_emails[0].args
+    assert subject == "Verify Your Account"
+    assert user_data["verification_url"] in html_content
+    assert recipient == user_data["email"]
 
 @pytest.mark.asyncio
-async def test_send_promotion_email(email_service):
+async def test_send_promotion_email(email_service, sent_emails):
     test_email = "test@example.com"
-    await email_service.send_pro_promotion_email(test_email)
\ No newline at end of file
+    await email_service.send_pro_promotion_email(test_email)
+    assert len(sent_emails) == 1
+    subject, html_content, recipient = sent_emails[0].args
+    assert subject == "Congratulations on Your Professional Upgrade!"
+    assert "Professional Membership" in html_content
+    assert recipient == test_email
@@ -0,0 +1,48 @@
+from datetime import timedelta
+import jwt
+from app.services import jwt_service
+from app.services.jwt_service import create_access_token, decode_token
+
+def test_decode_token_reuses_verified_payload(monkeypatch):
+    token = create_access_token(data={"sub": "cached-user", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    first = decode_token(token)
+    assert first["role"] == "ADMIN"
+
+    # A second decode of the same token must be served from the cache, not re-verified
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("token should not be verified twice")
+
+    monkeypatch.setattr(jwt_service.jwt, "decode", fail_decode)
+    assert decode_token(token) == first
+
+def test_decode_token_expired_cache_entry_is_reverified(monkeypatch):
+    token = create_access_token(data={"sub": "expired-user", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    real_exp = decode_token(token)["exp"]
+
+    # Simulate the cached entry outliving its token
+    stale = next(payload for payload in jwt_service._decoded_cache.values() if payload["sub"] == "expired-user")
+    stale["exp"] = 0
+
+    calls = []
+    real_decode = jwt_service.jwt.decode
+
+    def spy_decode(*args, **kwargs):
+        calls.append(args)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt_service.jwt, "decode", spy_decode)
+    decoded = decode_token(token)
+    assert len(calls) == 1
+    assert decoded["exp"] == real_exp
+
+    # The stale entry was replaced by the freshly verified payload
+    fresh = [payload for payload in jwt_service._decoded_cache.values() if payload["sub"] == "expired-user"]
+    assert len(fresh) == 1
+    assert fresh[0] is not stale
+    assert fresh[0]["exp"] == real_exp
+
+def test_decode_token_invalid_is_not_cached():
+    token = jwt.encode({"sub": "forged", "role": "ADMIN"}, "wrong-secret", algorithm="HS256")
+    assert decode_token(token) is None
+    assert decode_token(token) is None
+    assert all(payload["sub"] != "forged" for payload in jwt_service._decoded_cache.values())